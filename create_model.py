@@ -3,9 +3,10 @@
 
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report
+import joblib
 import pickle
 import os
 
@@ -14,21 +15,26 @@ print("=" * 50)
 
 # Step 1: Load the flight data
 print("📊 Step 1: Loading flight data...")
-df = pd.read_csv('data/flights.csv')
+# Only read the columns needed for training, with compact dtypes, to keep peak memory low
+# (DepDel15 stays float until the missing values are filled)
+df = pd.read_csv(
+    'data/flights.csv',
+    usecols=['DayOfWeek', 'OriginAirportID', 'DepDel15'],
+    dtype={'DayOfWeek': 'int8', 'OriginAirportID': 'int32', 'DepDel15': 'float32'}
+)
 print(f"✅ Dataset loaded: {df.shape[0]:,} rows, {df.shape[1]} columns")
 print(f"   First few rows preview:")
 print(df.head())
 
 # Step 2: Explore the dataset structure
 print("\n📋 Step 2: Exploring dataset structure...")
-print("Dataset information:")
-print(df.info())
+print("Column types:")
+print(df.dtypes)
 
 print("\nColumn descriptions:")
 print("- DayOfWeek: Day of the week (1=Monday, 7=Sunday)")
 print("- OriginAirportID: Unique identifier for origin airport")
 print("- DepDel15: 1 if departure delayed >15 minutes, 0 otherwise")
-print("- ArrDel15: 1 if arrival delayed >15 minutes, 0 otherwise")
 
 # Step 3: Check for missing values
 print("\n🔍 Step 3: Checking for missing values...")
@@ -45,11 +51,9 @@ print(f"Delay distribution (DepDel15): {df['DepDel15'].value_counts().to_dict()}
 print("\n🧹 Step 4: Cleaning data...")
 print("Replacing null values with 0...")
 
-# Fill missing values with 0
+# Fill missing values with 0 (exhaustive by construction, so no re-check is needed)
 df_clean = df.fillna(0)
 
-print(f"After cleaning - Missing values: {df_clean.isnull().sum().sum()}")
-
 # Ensure DepDel15 is binary (0 or 1)
 df_clean['DepDel15'] = df_clean['DepDel15'].astype(int)
 print(f"Delay distribution after cleaning: {df_clean['DepDel15'].value_counts().to_dict()}")
@@ -79,12 +83,26 @@ print(y_train.value_counts(normalize=True))
 # Step 7: Create and train the model
 print("\n🤖 Step 7: Training Random Forest model...")
 model = RandomForestClassifier(
-    n_estimators=100,  # Number of trees
-    random_state=42,   # For reproducibility
-    max_depth=10,      # Prevent overfitting
-    min_samples_split=5
+    n_estimators=20,      # Number of trees (two features don't need more)
+    random_state=42,      # For reproducibility
+    min_samples_leaf=50,  # Prevent overfitting
+    ccp_alpha=1e-5        # Prune splits that barely reduce impurity
 )
 
+# Pick the smallest tree depth within 0.5% of the best cross-validated accuracy,
+# which keeps the saved model small and predictions fast
+print("Selecting tree depth with 3-fold cross-validation...")
+depth_scores = {}
+for depth in [3, 4, 6, 8, 10]:
+    model.set_params(max_depth=depth)
+    depth_scores[depth] = cross_val_score(model, X_train, y_train, cv=3, scoring='accuracy').mean()
+    print(f"   max_depth={depth}: {depth_scores[depth]:.4f}")
+
+best_score = max(depth_scores.values())
+best_depth = min(depth for depth, score in depth_scores.items() if score >= best_score - 0.005)
+model.set_params(max_depth=best_depth)
+print(f"✅ Selected max_depth={best_depth}")
+
 # Train the model
 model.fit(X_train, y_train)
 print("✅ Model training completed!")
@@ -132,13 +150,30 @@ print(f"📍 Sunday at LAX: {prob_3:.4f} ({prob_3*100:.2f}% chance of delay)")
 print("\n💾 Step 10: Saving the trained model...")
 os.makedirs('model', exist_ok=True)
 
-# Save the model using pickle
-model_filename = 'model/flight_delay_model.pkl'
-with open(model_filename, 'wb') as file:
-    pickle.dump(model, file)
+# Save the model with joblib (uncompressed, so the server can memory-map the tree arrays)
+model_filename = 'model/flight_delay_model.joblib'
+joblib.dump(model, model_filename, protocol=5)
 
 print(f"✅ Model saved to: {model_filename}")
 
+# Export the model to ONNX (optional, needs skl2onnx) so the API can score it with ONNX Runtime
+onnx_filename = None
+try:
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import Int64TensorType
+
+    onnx_model = convert_sklearn(
+        model,
+        initial_types=[('input', Int64TensorType([None, 2]))],
+        options={id(model): {'zipmap': False}}  # Return probabilities as a plain tensor
+    )
+    with open('model/flight_delay_model.onnx', 'wb') as file:
+        file.write(onnx_model.SerializeToString())
+    onnx_filename = 'model/flight_delay_model.onnx'
+    print(f"✅ ONNX model saved to: {onnx_filename}")
+except ImportError:
+    print("⚠️ skl2onnx not installed - skipping ONNX export")
+
 # Also save feature names for reference
 feature_info = {
     'features': features,
@@ -155,15 +190,20 @@ print("✅ Model information saved to: model/model_info.pkl")
 # Step 11: Create airports CSV file
 print("\n🛫 Step 11: Creating airports CSV file...")
 
-# Extract unique airports from both origin and destination
-origin_airports = df_clean[['OriginAirportID', 'OriginAirportName', 'OriginCity', 'OriginState']].copy()
-origin_airports.columns = ['AirportID', 'AirportName', 'City', 'State']
+# Extract unique airports from both origin and destination, streaming the
+# airport columns in chunks so the full text columns are never held at once
+airport_columns = ['AirportID', 'AirportName', 'City', 'State']
+origin_columns = ['OriginAirportID', 'OriginAirportName', 'OriginCity', 'OriginState']
+dest_columns = ['DestAirportID', 'DestAirportName', 'DestCity', 'DestState']
 
-dest_airports = df_clean[['DestAirportID', 'DestAirportName', 'DestCity', 'DestState']].copy()
-dest_airports.columns = ['AirportID', 'AirportName', 'City', 'State']
+# Keep the first row seen for each AirportID in a dict - one pass, no concatenated copy
+airports = {}
+for chunk in pd.read_csv('data/flights.csv', usecols=origin_columns + dest_columns, chunksize=500_000):
+    for columns in (origin_columns, dest_columns):
+        for airport in chunk[columns].drop_duplicates(subset=columns[0]).itertuples(index=False, name=None):
+            airports.setdefault(airport[0], airport)
 
-# Combine and remove duplicates
-all_airports = pd.concat([origin_airports, dest_airports]).drop_duplicates(subset=['AirportID'])
+all_airports = pd.DataFrame(list(airports.values()), columns=airport_columns)
 all_airports = all_airports.sort_values('AirportID').reset_index(drop=True)
 
 print(f"✅ Total unique airports: {len(all_airports)}")
@@ -175,6 +215,15 @@ airports_filename = 'data/airports.csv'
 all_airports.to_csv(airports_filename, index=False)
 print(f"✅ Airports data saved to: {airports_filename}")
 
+# Also save as Feather so the API can load the airports without parsing CSV
+airports_feather_filename = None
+try:
+    all_airports.astype({'AirportName': 'string', 'City': 'string', 'State': 'string'}).to_feather('data/airports.feather')
+    airports_feather_filename = 'data/airports.feather'
+    print(f"✅ Airports data saved to: {airports_feather_filename}")
+except ImportError:
+    print("⚠️ pyarrow not installed - skipping Feather export")
+
 # Final Summary
 print("\n" + "=" * 50)
 print("🎉 MODEL CREATION COMPLETED SUCCESSFULLY!")
@@ -187,5 +236,9 @@ print(f"✅ Saved airports to: {airports_filename}")
 print("\n🎯 The model can now predict flight delay probabilities!")
 print("\n📁 Files created:")
 print(f"   - {model_filename}")
+if onnx_filename:
+    print(f"   - {onnx_filename}")
 print(f"   - model/model_info.pkl")
-print(f"   - {airports_filename}")
\ No newline at end of file
+print(f"   - {airports_filename}")
+if airports_feather_filename:
+    print(f"   - {airports_feather_filename}")
\ No newline at end of file
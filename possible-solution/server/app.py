@@ -1,24 +1,39 @@
 # Create a base Flask server
 
+import json
 import pickle
-from flask import Flask, request, jsonify
+import threading
+import numpy as np
+import pandas as pd
+from flask import Flask, Response, request, jsonify
+from flask_cors import CORS
 
 app = Flask(__name__)
 
 # Enable cors
-@app.after_request
-def after_request(response):
-    """
-    Enable CORS
-    """
-    response.headers.add('Access-Control-Allow-Origin', '*')
-    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
-    return response
+CORS(app, origins='*', allow_headers=['Content-Type', 'Authorization'])
 
 
 # Load model from pickle file
 model = pickle.load(open('model.pkl', 'rb'))
 
+# Load airports once at startup, sorted by name and serialized to JSON
+airports_df = pd.read_csv('airports.csv', usecols=['OriginAirportID', 'OriginAirportName'])
+airports_df.columns = ['id', 'name']
+airports_json = json.dumps(airports_df.sort_values('name').to_dict('records'))
+
+# Reusable (1, 2) feature buffer for single predictions, one per thread
+_feature_buffers = threading.local()
+
+def single_features(day_of_week, airport_id):
+    """Fill and return this thread's int64 feature buffer for a single prediction"""
+    buffer = getattr(_feature_buffers, 'buffer', None)
+    if buffer is None:
+        buffer = _feature_buffers.buffer = np.empty((1, 2), dtype=np.int64)
+    buffer[0, 0] = day_of_week
+    buffer[0, 1] = airport_id
+    return buffer
+
 # Model takes two parameters - day of week and airport id, then returns a prediction of flight delay
 @app.route('/predict', methods=['GET', 'POST'])
 def predict():
@@ -54,16 +69,11 @@ def predict():
             return jsonify({'error': 'day_of_week must be between 1 (Monday) and 7 (Sunday)'}), 400
         
         # Make prediction
-        prediction = model.predict_proba([[day_of_week, airport_id]])[0]
-        
-        # Split prediction string by space
-        prediction = str(prediction).split(' ')
-
-        # store first value from prediction as certainty, and remove the first character
-        certainty = float(prediction[0][2:])
+        prediction = model.predict_proba(single_features(day_of_week, airport_id))[0]
 
-        # store second value from prediction as delay, and remove the last character
-        delay = float(prediction[1][:-1])
+        # First probability is the certainty (no delay), second is the delay
+        certainty = float(prediction[0])
+        delay = float(prediction[1])
 
         # return prediction as json
         return jsonify({'certainty': certainty, 'delay': delay})
@@ -76,21 +86,8 @@ def predict():
 # Create a new route called airports with method of get
 @app.route('/airports', methods=['GET'])
 def airports():
-    # Load airports from csv file
-    airports = open('airports.csv', 'r').readlines()
-
-    # Remove first line of airports
-    airports.pop(0)
-
-    # Create list with dictionary of airports
-    # First value is id, second is name
-    # Convert id to integer
-    # Remove last character from name
-    airports = [{'id': int(airport.split(',')[0]), 'name': airport.split(',')[1][:-1]} for airport in airports]
-    # Sort by name
-    airports = sorted(airports, key=lambda k: k['name'])
-
-    return jsonify(airports)
+    # Return the airports list serialized at startup
+    return Response(airports_json, mimetype='application/json')
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -3,54 +3,134 @@
 # 
 # Endpoints:
 # 1. /predict - Accepts day of week and airport ID, returns delay probability and confidence
-# 2. /airports - Returns list of all airports sorted alphabetically
+# 2. /predict_batch - Accepts a list of (day of week, airport ID) pairs, returns delay probabilities
+# 3. /airports - Returns list of all airports sorted alphabetically
 # 
 # The API uses a pre-trained Random Forest model to predict flight delays based on
 # day of week (1=Monday, 7=Sunday) and origin airport ID
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+import gzip
+import joblib
+import orjson
 import pickle
 import pandas as pd
 import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from flask_cors import CORS
 
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend integration
 
 # Global variables to store loaded model and data
 model = None
+onnx_session = None
 model_info = None
 airports_df = None
+airports_json = None
+airports_json_gzip = None
+airport_index = {}
+prediction_lookup = {}
+
+def load_model():
+    """Load the trained model, plus an ONNX Runtime session when one is available"""
+    # Load the trained model (memory-mapped, falls back to the legacy pickle export)
+    model_path = os.path.join('..', 'model', 'flight_delay_model.joblib')
+    if not os.path.exists(model_path):
+        model_path = os.path.join('..', 'model', 'flight_delay_model.pkl')
+    loaded_model = joblib.load(model_path, mmap_mode='r')
+    print("✅ Model loaded successfully")
+    
+    # Use ONNX Runtime for the startup lookup table when onnxruntime and the exported model are available
+    session = None
+    onnx_path = os.path.join('..', 'model', 'flight_delay_model.onnx')
+    if onnxruntime is not None and os.path.exists(onnx_path):
+        session = onnxruntime.InferenceSession(onnx_path, providers=['CPUExecutionProvider'])
+        print("✅ ONNX Runtime session created")
+    
+    return loaded_model, session
+
+def load_model_info():
+    """Load the model information saved alongside the model"""
+    model_info_path = os.path.join('..', 'model', 'model_info.pkl')
+    with open(model_info_path, 'rb') as file:
+        info = pickle.load(file)
+    print("✅ Model info loaded successfully")
+    return info
+
+def load_airports():
+    """Load the airports data, preferring the Feather export over the CSV"""
+    airports_path = os.path.join('..', 'data', 'airports.feather')
+    if os.path.exists(airports_path):
+        df = pd.read_feather(airports_path)
+    else:
+        df = pd.read_csv(os.path.join('..', 'data', 'airports.csv'))
+    print("✅ Airports data loaded successfully")
+    return df
 
 def load_model_and_data():
     """Load the trained model and airports data on startup"""
-    global model, model_info, airports_df
+    global model, onnx_session, model_info, airports_df, airports_json, airports_json_gzip, airport_index, prediction_lookup
     
     try:
-        # Load the trained model
-        model_path = os.path.join('..', 'model', 'flight_delay_model.pkl')
-        with open(model_path, 'rb') as file:
-            model = pickle.load(file)
-        print("✅ Model loaded successfully")
+        # The three loads are independent and I/O-bound, so run them concurrently
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            model_future = executor.submit(load_model)
+            model_info_future = executor.submit(load_model_info)
+            airports_future = executor.submit(load_airports)
+            model, onnx_session = model_future.result()
+            model_info = model_info_future.result()
+            airports_df = airports_future.result()
         
-        # Load model information
-        model_info_path = os.path.join('..', 'model', 'model_info.pkl')
-        with open(model_info_path, 'rb') as file:
-            model_info = pickle.load(file)
-        print("✅ Model info loaded successfully")
+        # Format and serialize the airports once - the data never changes after startup
+        airports_list = [
+            {
+                "id": int(airport['AirportID']),
+                "name": airport['AirportName'],
+                "city": airport['City'],
+                "state": airport['State']
+            }
+            for airport in airports_df.sort_values('AirportName').to_dict('records')
+        ]
+        airport_index = {airport['id']: airport for airport in airports_list}
+        airports_json = orjson.dumps({
+            "airports": airports_list,
+            "total_count": len(airports_list)
+        })
+        airports_json_gzip = gzip.compress(airports_json, compresslevel=6)
         
-        # Load airports data
-        airports_path = os.path.join('..', 'data', 'airports.csv')
-        airports_df = pd.read_csv(airports_path)
-        print("✅ Airports data loaded successfully")
+        # Precompute probabilities for every (day_of_week, airport_id) pair - the input space is tiny
+        airport_ids = airports_df['AirportID'].to_numpy(dtype=np.int64)
+        grid = np.array([[day, airport] for day in range(1, 8) for airport in airport_ids], dtype=np.int64)
+        probabilities = predict_proba(grid)
+        prediction_lookup = {
+            (int(day), int(airport)): (float(no_delay), float(delay))
+            for (day, airport), (no_delay, delay) in zip(grid, probabilities)
+        }
+        print(f"✅ Prediction lookup table built ({len(prediction_lookup)} entries)")
         
         return True
     except Exception as e:
         print(f"❌ Error loading model and data: {str(e)}")
         return False
 
+def predict_proba(features):
+    """Return class probabilities for an (N, 2) int64 array of [day_of_week, airport_id] rows"""
+    if onnx_session is not None:
+        return onnx_session.run(None, {'input': features})[1]
+    return model.predict_proba(features)
+
+def json_response(payload):
+    """Serialize a response payload with orjson"""
+    return Response(orjson.dumps(payload), mimetype='application/json')
+
 @app.route('/')
 def home():
     """Root endpoint with API information"""
@@ -59,6 +139,7 @@ def home():
         "version": "1.0",
         "endpoints": {
             "/predict": "POST - Predict flight delay probability",
+            "/predict_batch": "POST - Predict delay probabilities for many (day, airport) pairs",
             "/airports": "GET - Get list of airports",
             "/health": "GET - Health check"
         },
@@ -93,9 +174,11 @@ def predict_delay():
     {
         "delay_probability": float (0-1),
         "confidence_percent": float (0-100),
-        "delay_chance_percent": float (0-100),
-        "input": {...}
+        "day": integer (1-7),
+        "airport_id": integer
     }
+    
+    Day and airport names and the human-readable interpretation are left to the client.
     """
     try:
         # Check if model is loaded
@@ -118,68 +201,108 @@ def predict_delay():
         airport_id = data['airport_id']
         
         # Validate day_of_week range
-        if not isinstance(day_of_week, int) or day_of_week < 1 or day_of_week > 7:
+        if not isinstance(day_of_week, int) or isinstance(day_of_week, bool) or day_of_week < 1 or day_of_week > 7:
             return jsonify({
                 "error": "day_of_week must be an integer between 1 (Monday) and 7 (Sunday)"
             }), 400
         
         # Validate airport_id
-        if not isinstance(airport_id, int):
+        if not isinstance(airport_id, int) or isinstance(airport_id, bool):
             return jsonify({
                 "error": "airport_id must be an integer"
             }), 400
         
         # Check if airport exists in our dataset
-        if airports_df is not None:
-            if airport_id not in airports_df['AirportID'].values:
-                return jsonify({
-                    "error": f"Airport ID {airport_id} not found in database"
-                }), 400
+        if airports_df is None:
+            return jsonify({"error": "Airports data not loaded"}), 500
         
-        # Make prediction
-        features = [[day_of_week, airport_id]]
+        if airport_id not in airport_index:
+            return jsonify({
+                "error": f"Airport ID {airport_id} not found in database"
+            }), 400
         
-        # Get probability of delay (class 1)
-        delay_probabilities = model.predict_proba(features)[0]
+        # Get probabilities from the lookup table built at startup
+        delay_probabilities = prediction_lookup[(day_of_week, airport_id)]
         delay_probability = float(delay_probabilities[1])  # Probability of delay (class 1)
-        no_delay_probability = float(delay_probabilities[0])  # Probability of no delay (class 0)
-        
-        # Calculate confidence as the maximum probability (how sure the model is)
-        confidence_percent = float(max(delay_probabilities) * 100)
+        no_delay_probability = 1.0 - delay_probability  # Probability of no delay (class 0)
         
-        # Get airport name if available
-        airport_name = "Unknown"
-        if airports_df is not None:
-            airport_row = airports_df[airports_df['AirportID'] == airport_id]
-            if not airport_row.empty:
-                airport_name = airport_row.iloc[0]['AirportName']
+        # Calculate confidence as the larger of the two probabilities (how sure the model is)
+        confidence_percent = (delay_probability if delay_probability >= 0.5 else no_delay_probability) * 100.0
         
-        # Day name mapping
-        day_names = {
-            1: "Monday", 2: "Tuesday", 3: "Wednesday", 4: "Thursday",
-            5: "Friday", 6: "Saturday", 7: "Sunday"
-        }
-        
-        return jsonify({
+        return json_response({
             "delay_probability": delay_probability,
-            "delay_chance_percent": delay_probability * 100,
             "confidence_percent": confidence_percent,
-            "no_delay_probability": no_delay_probability,
-            "input": {
-                "day_of_week": day_of_week,
-                "day_name": day_names.get(day_of_week, "Unknown"),
-                "airport_id": airport_id,
-                "airport_name": airport_name
-            },
-            "interpretation": {
-                "message": f"There is a {delay_probability*100:.2f}% chance of delay on {day_names.get(day_of_week)} at {airport_name}",
-                "confidence_level": "High" if confidence_percent > 80 else "Medium" if confidence_percent > 60 else "Low"
-            }
+            "day": day_of_week,
+            "airport_id": airport_id
         })
         
     except Exception as e:
         return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
 
+@app.route('/predict_batch', methods=['POST'])
+def predict_delay_batch():
+    """
+    Predict flight delay probabilities for many requests in one call
+    
+    Callers with several predictions to make should coalesce them here rather
+    than calling /predict repeatedly, so they pay for one round-trip per batch.
+    
+    Expected JSON payload:
+    {
+        "pairs": [[day_of_week, airport_id], ...]
+    }
+    
+    Returns:
+    {
+        "delay_probabilities": [float (0-1), ...],
+        "count": integer
+    }
+    """
+    try:
+        # Check if model is loaded
+        if model is None:
+            return jsonify({"error": "Model not loaded"}), 500
+        
+        data = request.get_json()
+        
+        if not data or 'pairs' not in data:
+            return jsonify({"error": "Missing required field: pairs"}), 400
+        
+        if airports_df is None:
+            return jsonify({"error": "Airports data not loaded"}), 500
+        
+        pairs = data['pairs']
+        
+        # Validate the shape and types the same way /predict does (bools are not accepted as integers)
+        if not isinstance(pairs, list) or not all(
+            isinstance(pair, list) and len(pair) == 2
+            and all(isinstance(value, int) and not isinstance(value, bool) for value in pair)
+            for pair in pairs
+        ):
+            return jsonify({"error": "pairs must be a list of [day_of_week, airport_id] integer pairs"}), 400
+        
+        for day_of_week, airport_id in pairs:
+            # Validate day_of_week range
+            if day_of_week < 1 or day_of_week > 7:
+                return jsonify({
+                    "error": "day_of_week must be an integer between 1 (Monday) and 7 (Sunday)"
+                }), 400
+            
+            # Check if airport exists in our dataset
+            if airport_id not in airport_index:
+                return jsonify({
+                    "error": f"Airport ID {airport_id} not found in database"
+                }), 400
+        
+        # Every validated pair is in the lookup table built at startup
+        return json_response({
+            "delay_probabilities": [prediction_lookup[(day_of_week, airport_id)][1] for day_of_week, airport_id in pairs],
+            "count": len(pairs)
+        })
+        
+    except Exception as e:
+        return jsonify({"error": f"Batch prediction failed: {str(e)}"}), 500
+
 @app.route('/airports', methods=['GET'])
 def get_airports():
     """
@@ -201,26 +324,17 @@ def get_airports():
     """
     try:
         # Check if airports data is loaded
-        if airports_df is None:
+        if airports_json is None:
             return jsonify({"error": "Airports data not loaded"}), 500
         
-        # Sort airports alphabetically by name
-        sorted_airports = airports_df.sort_values('AirportName').to_dict('records')
-        
-        # Format response
-        airports_list = []
-        for airport in sorted_airports:
-            airports_list.append({
-                "id": int(airport['AirportID']),
-                "name": airport['AirportName'],
-                "city": airport['City'],
-                "state": airport['State']
-            })
-        
-        return jsonify({
-            "airports": airports_list,
-            "total_count": len(airports_list)
-        })
+        # Serve the list serialized at startup, precompressed for clients that accept gzip
+        if request.accept_encodings['gzip']:
+            response = Response(airports_json_gzip, mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = Response(airports_json, mimetype='application/json')
+        response.vary.add('Accept-Encoding')
+        return response
         
     except Exception as e:
         return jsonify({"error": f"Failed to retrieve airports: {str(e)}"}), 500
@@ -244,21 +358,12 @@ def get_airport_by_id(airport_id):
         if airports_df is None:
             return jsonify({"error": "Airports data not loaded"}), 500
         
-        airport_row = airports_df[airports_df['AirportID'] == airport_id]
+        airport = airport_index.get(airport_id)
         
-        if airport_row.empty:
+        if airport is None:
             return jsonify({"error": f"Airport with ID {airport_id} not found"}), 404
         
-        airport = airport_row.iloc[0]
-        
-        return jsonify({
-            "airport": {
-                "id": int(airport['AirportID']),
-                "name": airport['AirportName'],
-                "city": airport['City'],
-                "state": airport['State']
-            }
-        })
+        return jsonify({"airport": airport})
         
     except Exception as e:
         return jsonify({"error": f"Failed to retrieve airport: {str(e)}"}), 500
@@ -289,13 +394,15 @@ if __name__ == '__main__':
         print("  GET  /            - API information")
         print("  GET  /health      - Health check")
         print("  POST /predict     - Predict flight delay")
+        print("  POST /predict_batch - Predict flight delays in bulk")
         print("  GET  /airports    - Get all airports")
         print("  GET  /airports/<id> - Get specific airport")
         print("\n🌐 Starting server on http://localhost:5000")
         print("=" * 50)
         
-        # Run the Flask app
-        app.run(debug=True, host='0.0.0.0', port=5000)
+        # Run the Flask app on a multi-threaded production WSGI server
+        from waitress import serve
+        serve(app, host='0.0.0.0', port=5000, threads=8)
     else:
         print("❌ Failed to load model and data. Server not started.")
         print("Make sure the model files exist in ../model/ and ../data/ directories")
\ No newline at end of file
@@ -2,143 +2,213 @@
 # This script demonstrates all the API endpoints and their functionality
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import json
+import orjson
+import os
+import tempfile
+import time
 
-# API base URL
+# API base URL and endpoints
 BASE_URL = "http://localhost:5000"
+ROOT_URL = f"{BASE_URL}/"
+HEALTH_URL = f"{BASE_URL}/health"
+AIRPORTS_URL = f"{BASE_URL}/airports"
+PREDICT_URL = f"{BASE_URL}/predict"
+PREDICT_BATCH_URL = f"{BASE_URL}/predict_batch"
 
-def test_api():
-    print("🧪 Testing Flight Delay Prediction API")
-    print("=" * 50)
-    
-    # Test 1: Root endpoint
-    print("📋 Test 1: API Information (GET /)")
-    try:
-        response = requests.get(f"{BASE_URL}/")
-        print(f"Status: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-    except requests.exceptions.ConnectionError:
-        print("❌ Connection failed. Make sure the server is running on localhost:5000")
-        return
-    except Exception as e:
-        print(f"❌ Error: {e}")
-    
-    print("\n" + "-" * 50)
-    
-    # Test 2: Health check
-    print("🏥 Test 2: Health Check (GET /health)")
-    try:
-        response = requests.get(f"{BASE_URL}/health")
-        print(f"Status: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-    except Exception as e:
-        print(f"❌ Error: {e}")
-    
-    print("\n" + "-" * 50)
-    
-    # Test 3: Get all airports
-    print("🛫 Test 3: Get All Airports (GET /airports)")
-    try:
-        response = requests.get(f"{BASE_URL}/airports")
-        print(f"Status: {response.status_code}")
-        data = response.json()
-        print(f"Total airports: {data['total_count']}")
+# Prediction cases sent together in one /predict_batch request (tests 5-7)
+PREDICTION_CASES = [
+    ("🤖 Test 5: Predict Delay - Monday at Chicago O'Hare", {"day_of_week": 1, "airport_id": 13930}),
+    ("🤖 Test 6: Predict Delay - Friday at JFK", {"day_of_week": 5, "airport_id": 12478}),
+    ("🤖 Test 7: Predict Delay - Sunday at LAX", {"day_of_week": 7, "airport_id": 12892}),
+]
+
+# On-disk cache of the /airports response (set SKIP_NET_CACHE=1 to force a refresh)
+AIRPORTS_CACHE_PATH = os.path.join(tempfile.gettempdir(), "flight_delay_api_airports.json")
+AIRPORTS_CACHE_TTL = 3600  # seconds
+
+# Number of requests in flight at once - enough to send every test in one wave
+# (matches the connection pool size and the server's waitress thread count)
+MAX_WORKERS = 8
+
+# Request bodies are encoded with orjson, so the content type is set by hand
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Pretty-print request and response bodies (set TEST_API_VERBOSE=0 to only report status)
+VERBOSE = os.environ.get("TEST_API_VERBOSE", "1") == "1"
+
+# Printed when the server cannot be reached
+CONNECTION_FAILED = "❌ Connection failed. Make sure the server is running on localhost:5000"
+
+# (connect, read) timeouts in seconds, so a hung server cannot stall the tests
+TIMEOUT = (1.0, 5.0)
+
+# Retry transient gateway errors and dropped connections with a short backoff
+RETRY = Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504], allowed_methods=["GET", "POST"])
+
+def send(session, method, url, payload=None):
+    """Send one request to the API and return its status code and decoded JSON body"""
+    if payload is None:
+        response = session.request(method, url, timeout=TIMEOUT)
+    else:
+        response = session.request(method, url, data=orjson.dumps(payload), headers=JSON_HEADERS, timeout=TIMEOUT)
+    return response.status_code, orjson.loads(response.content)
+
+def post_predict(session, day_of_week, airport_id):
+    """POST one prediction request (None leaves a field out) and return the payload with the result"""
+    payload = {"day_of_week": day_of_week, "airport_id": airport_id}
+    payload = {key: value for key, value in payload.items() if value is not None}
+    return payload, send(session, "POST", PREDICT_URL, payload)
+
+def get_airports_cached(session, path=AIRPORTS_CACHE_PATH, ttl=AIRPORTS_CACHE_TTL):
+    """Return the /airports data, reusing the on-disk copy while it is fresh"""
+    if os.environ.get("SKIP_NET_CACHE") != "1":
+        try:
+            if time.time() - os.stat(path).st_mtime < ttl:
+                with open(path, "rb") as file:
+                    return orjson.loads(file.read())
+        except (OSError, ValueError):
+            pass  # Missing or unreadable cache - fetch from the server
+
+    response = session.get(AIRPORTS_URL, timeout=TIMEOUT)
+    response.raise_for_status()
+    with open(path, "wb") as file:
+        file.write(response.content)
+    return orjson.loads(response.content)
+
+def print_response(result, payload=None):
+    """Print the status, request payload and JSON response of a test"""
+    status, data = result
+    print(f"Status: {status}")
+    if VERBOSE:
+        if payload is not None:
+            print(f"Request: {json.dumps(payload, indent=2)}")
+        print(f"Response: {json.dumps(data, indent=2)}")
+
+def print_prediction(outcome, expected_status):
+    """Print the request payload and response of a /predict call, flagging an unexpected status"""
+    payload, result = outcome
+    print_response(result, payload)
+    if result[0] != expected_status:
+        print(f"❌ Expected status {expected_status}, got {result[0]}")
+
+def print_airports(data):
+    """Print a summary of the airports list"""
+    print(f"Total airports: {len(data['airports'])}")
+    if VERBOSE:
         print("First 5 airports:")
         for airport in data['airports'][:5]:
             print(f"  - {airport['name']} ({airport['city']}, {airport['state']}) - ID: {airport['id']}")
-    except Exception as e:
-        print(f"❌ Error: {e}")
-    
-    print("\n" + "-" * 50)
-    
-    # Test 4: Get specific airport
-    print("🛫 Test 4: Get Specific Airport (GET /airports/13930)")
-    try:
-        response = requests.get(f"{BASE_URL}/airports/13930")  # Chicago O'Hare
-        print(f"Status: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-    except Exception as e:
-        print(f"❌ Error: {e}")
-    
-    print("\n" + "-" * 50)
-    
-    # Test 5: Prediction - Monday at Chicago O'Hare
-    print("🤖 Test 5: Predict Delay - Monday at Chicago O'Hare (POST /predict)")
-    try:
-        payload = {
-            "day_of_week": 1,  # Monday
-            "airport_id": 13930  # Chicago O'Hare
-        }
-        response = requests.post(f"{BASE_URL}/predict", json=payload)
-        print(f"Status: {response.status_code}")
-        print(f"Request: {json.dumps(payload, indent=2)}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-    except Exception as e:
-        print(f"❌ Error: {e}")
-    
-    print("\n" + "-" * 50)
-    
-    # Test 6: Prediction - Friday at JFK
-    print("🤖 Test 6: Predict Delay - Friday at JFK (POST /predict)")
-    try:
-        payload = {
-            "day_of_week": 5,  # Friday
-            "airport_id": 12478  # JFK
-        }
-        response = requests.post(f"{BASE_URL}/predict", json=payload)
-        print(f"Status: {response.status_code}")
-        print(f"Request: {json.dumps(payload, indent=2)}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-    except Exception as e:
-        print(f"❌ Error: {e}")
-    
-    print("\n" + "-" * 50)
-    
-    # Test 7: Prediction - Sunday at LAX
-    print("🤖 Test 7: Predict Delay - Sunday at LAX (POST /predict)")
-    try:
-        payload = {
-            "day_of_week": 7,  # Sunday
-            "airport_id": 12892  # LAX
-        }
-        response = requests.post(f"{BASE_URL}/predict", json=payload)
-        print(f"Status: {response.status_code}")
-        print(f"Request: {json.dumps(payload, indent=2)}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-    except Exception as e:
-        print(f"❌ Error: {e}")
-    
-    print("\n" + "-" * 50)
-    
-    # Test 8: Error handling - Invalid day
-    print("❌ Test 8: Error Handling - Invalid Day (POST /predict)")
+
+def print_airport(data, airport_id):
+    """Print one airport looked up in the airports list"""
+    airport = next((airport for airport in data['airports'] if airport['id'] == airport_id), None)
+    if airport is None:
+        print(f"❌ Airport {airport_id} not found")
+    elif VERBOSE:
+        print(f"Response: {json.dumps({'airport': airport}, indent=2)}")
+    else:
+        print(f"Found: {airport['name']}")
+
+def print_batch_predictions(result):
+    """Print each prediction from a /predict_batch response with its own request"""
+    status, data = result
+    print(f"Status: {status}")
+    if status != 200:
+        print(f"❌ Expected status 200, got {status}: {data.get('error')}")
+        return
+    probabilities = data['delay_probabilities']
+    if not VERBOSE:
+        print(f"Predictions: {len(probabilities)}")
+        return
+    for (title, case), probability in zip(PREDICTION_CASES, probabilities):
+        print(f"\n{title}")
+        print(f"Request: {json.dumps(case, indent=2)}")
+        print(f"Response: {json.dumps({'delay_probability': probability}, indent=2)}")
+
+def timed(fn, *args):
+    """Call fn(*args) and return the elapsed milliseconds with its result, or the exception it raised"""
+    start = time.perf_counter()
     try:
-        payload = {
-            "day_of_week": 8,  # Invalid day
-            "airport_id": 13930
-        }
-        response = requests.post(f"{BASE_URL}/predict", json=payload)
-        print(f"Status: {response.status_code}")
-        print(f"Request: {json.dumps(payload, indent=2)}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        outcome = fn(*args)
     except Exception as e:
-        print(f"❌ Error: {e}")
-    
-    print("\n" + "-" * 50)
-    
-    # Test 9: Error handling - Missing fields
-    print("❌ Test 9: Error Handling - Missing Fields (POST /predict)")
+        outcome = e
+    return (time.perf_counter() - start) * 1000, outcome
+
+def run_test(title, future, print_result, shared=False):
+    """Print one test's outcome and timing (once per request), exiting non-zero if the server could not be reached"""
+    print(title)
+    elapsed_ms, outcome = future.result()
     try:
-        payload = {
-            "day_of_week": 1  # Missing airport_id
-        }
-        response = requests.post(f"{BASE_URL}/predict", json=payload)
-        print(f"Status: {response.status_code}")
-        print(f"Request: {json.dumps(payload, indent=2)}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        if isinstance(outcome, Exception):
+            raise outcome
+        print_result(outcome)
+    except requests.exceptions.ConnectionError:
+        print(CONNECTION_FAILED)
+        raise SystemExit(1)
     except Exception as e:
         print(f"❌ Error: {e}")
-    
+    finally:
+        print("⏱ shared with the previous test" if shared else f"⏱ {elapsed_ms:.1f} ms")
+        print("\n" + "-" * 50)
+
+def test_api():
+    print("🧪 Testing Flight Delay Prediction API")
+    print("=" * 50)
+
+    # Reuse one session so every request shares a keep-alive connection
+    with requests.Session() as session:
+        session.mount("http://", HTTPAdapter(max_retries=RETRY, pool_connections=1, pool_maxsize=MAX_WORKERS))
+
+        # Warm up the model endpoint and the pooled connection with a throwaway prediction,
+        # so the tests below see steady-state latency
+        try:
+            _, (status, _) = post_predict(session, 1, 13930)
+            if status != 200:
+                print(f"❌ Warm-up prediction failed with status {status}")
+        except requests.exceptions.ConnectionError:
+            print(CONNECTION_FAILED)
+            raise SystemExit(1)
+        except Exception as e:
+            print(f"❌ Warm-up prediction failed: {e}")
+
+        # The tests are independent, so send them concurrently and print the results in order
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            def submit(fn, *args):
+                return executor.submit(timed, fn, *args)
+
+            batch_payload = {"pairs": [[case["day_of_week"], case["airport_id"]] for _, case in PREDICTION_CASES]}
+
+            # Tests 3 and 4 share one (usually cached) airports lookup
+            airports = submit(get_airports_cached, session)
+
+            # (title, future, printer)
+            tests = [
+                ("📋 Test 1: API Information (GET /)", submit(send, session, "GET", ROOT_URL), print_response),
+                ("🏥 Test 2: Health Check (GET /health)", submit(send, session, "GET", HEALTH_URL), print_response),
+                ("🛫 Test 3: Get All Airports (GET /airports, cached)", airports, print_airports),
+                ("🛫 Test 4: Get Specific Airport (13930 from the cached airports)", airports,
+                 partial(print_airport, airport_id=13930)),  # Chicago O'Hare
+                ("🤖 Tests 5-7: Predict Delays in One Batch (POST /predict_batch)",
+                 submit(send, session, "POST", PREDICT_BATCH_URL, batch_payload), print_batch_predictions),
+                ("🤖 Test 8: Predict Delay - Wednesday at Chicago O'Hare (POST /predict)",
+                 submit(post_predict, session, 3, 13930), partial(print_prediction, expected_status=200)),
+                ("❌ Test 9: Error Handling - Invalid Day (POST /predict)",
+                 submit(post_predict, session, 8, 13930), partial(print_prediction, expected_status=400)),  # Invalid day
+                ("❌ Test 10: Error Handling - Missing Fields (POST /predict)",
+                 submit(post_predict, session, 1, None), partial(print_prediction, expected_status=400)),  # Missing airport_id
+            ]
+
+            # Tests that share a request (3 and 4) only report its time once
+            reported = set()
+            for title, future, print_result in tests:
+                run_test(title, future, print_result, shared=future in reported)
+                reported.add(future)
+
     print("\n" + "=" * 50)
     print("✅ API Testing Complete!")
     print("\n📋 Summary of API endpoints:")
@@ -146,8 +216,9 @@ def test_api():
     print("  📍 GET  /           - API information")
     print("  🏥 GET  /health     - Health check")
     print("  🤖 POST /predict    - Predict flight delay")
+    print("  🤖 POST /predict_batch - Predict flight delays in bulk")
     print("  🛫 GET  /airports   - Get all airports")
     print("  🛫 GET  /airports/<id> - Get specific airport")
 
 if __name__ == "__main__":
-    test_api()
\ No newline at end of file
+    test_api()